@@ -0,0 +1,153 @@
+import io
+import json
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import xml2md
+
+CASES = {
+    "canonical": """
+        <function>
+          <name>calc_total</name>
+          <purpose>合計を求める</purpose>
+          <summary>
+            一行目
+            二行目
+          </summary>
+          <arguments>
+            <arg><name>a</name><type>int</type><description>値</description></arg>
+            <arg><name>b</name></arg>
+          </arguments>
+          <return-value><type>int</type><description>合計</description></return-value>
+          <remarks>
+            - 注意1
+            -注意2
+            注意3
+          </remarks>
+          <process-flow><step>読む</step><step>足す</step></process-flow>
+          <database-queries>
+            <query><description>取得</description><pseudo-sql>SELECT 1</pseudo-sql></query>
+          </database-queries>
+        </function>
+    """,
+    "out_of_order": """
+        <function>
+          <database-queries><query><pseudo-sql>SELECT *</pseudo-sql></query></database-queries>
+          <process-flow><step>最後に書いた手順</step></process-flow>
+          <remarks>備考</remarks>
+          <arguments><arg><type>char *</type></arg></arguments>
+          <summary>概要</summary>
+          <name>reversed</name>
+        </function>
+    """,
+    "duplicates": """
+        <function>
+          <name>first</name>
+          <name>second</name>
+          <process-flow><step>a</step></process-flow>
+          <purpose>先の目的</purpose>
+          <process-flow><step>ignored</step></process-flow>
+          <purpose>後の目的</purpose>
+        </function>
+    """,
+    "empty_sections": """
+        <function>
+          <name>empty</name>
+          <purpose>   </purpose>
+          <summary/>
+          <arguments><other/><arg/></arguments>
+          <return-value><type/></return-value>
+          <remarks>
+          </remarks>
+          <process-flow><step/><step>  </step><step>only <b>one</b></step><step/></process-flow>
+          <database-queries><query/></database-queries>
+        </function>
+    """,
+    "trailing_empty": """
+        <function>
+          <process-flow><step/></process-flow>
+          <database-queries/>
+          <unknown><nested>x</nested></unknown>
+        </function>
+    """,
+    "nothing": "<function/>",
+}
+
+
+def _stream(xml_path, analysis=None, doc_lookup=None):
+    buffer = io.StringIO()
+    xml2md.convert_to_stream(
+        xml_path, buffer, analysis=analysis, doc_lookup=doc_lookup
+    )
+    return buffer.getvalue()
+
+
+class StreamingMatchesInMemoryTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+
+    def _write_doc(self, directory, xml):
+        directory.mkdir(parents=True, exist_ok=True)
+        xml_path = directory / "doc.xml"
+        xml_path.write_text(xml, encoding="utf-8")
+        return xml_path
+
+    def test_sections(self):
+        for label, xml in CASES.items():
+            with self.subTest(label):
+                xml_path = self._write_doc(self.root / label, xml)
+                self.assertEqual(_stream(xml_path), xml2md.convert(xml_path))
+
+    def test_dependencies(self):
+        caller = self._write_doc(self.root / "caller", CASES["canonical"])
+        (caller.parent / "func_caller").touch()
+        callee = self._write_doc(self.root / "callee", CASES["out_of_order"])
+        (callee.parent / "func_callee").touch()
+        analysis_path = self.root / "analysis_result.json"
+        analysis_path.write_text(
+            json.dumps(
+                [
+                    {"type": "func", "id": "func_caller", "name": "caller",
+                     "calls": ["func_callee"]},
+                    {"type": "func", "id": "func_callee", "name": "callee",
+                     "calls": []},
+                ]
+            ),
+            encoding="utf-8",
+        )
+        analysis = xml2md.AnalysisIndex.from_file(analysis_path)
+        for xml_path in (caller, callee):
+            with self.subTest(xml_path.parent.name):
+                expected = xml2md.convert(
+                    xml_path, analysis, xml2md.build_doc_lookup(self.root)
+                )
+                actual = _stream(
+                    xml_path, analysis, xml2md.build_doc_lookup(self.root)
+                )
+                self.assertIn("## Caller", actual)
+                self.assertEqual(actual, expected)
+
+    def test_failure_keeps_existing_output(self):
+        for label, xml in (
+            ("malformed", "<function><name>a</name><purp"),
+            ("wrong_root", "<doc><name>a</name></doc>"),
+        ):
+            with self.subTest(label):
+                xml_path = self._write_doc(self.root / label, xml)
+                output_path = xml_path.with_name("doc.md")
+                output_path.write_text("previous", encoding="utf-8")
+                with self.assertRaises((ET.ParseError, ValueError)):
+                    xml2md.process_directory(xml_path.parent, None, stream=True)
+                self.assertEqual(output_path.read_text(encoding="utf-8"), "previous")
+                self.assertEqual(
+                    sorted(p.name for p in xml_path.parent.iterdir()),
+                    ["doc.md", "doc.xml"],
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
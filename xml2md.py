@@ -10,6 +10,7 @@ import xml.etree.ElementTree as ET
 from collections import defaultdict
 from functools import lru_cache
 from pathlib import Path
+from typing import TextIO
 
 
 def _extract_text(node):
@@ -31,62 +32,54 @@ def _collect_lines(text):
     return [line.rstrip() for line in text.splitlines()]
 
 
-def function_to_markdown(root: ET.Element) -> str:
-    lines: list[str] = []
+def _name_lines(node) -> list[str]:
+    name = _extract_text(node)
+    if not name:
+        return []
+    return [f"# {name}", ""]
 
-    name = _extract_text(root.find("name"))
-    if name:
-        lines.append(f"# {name}")
-        lines.append("")
-
-    purpose = _extract_text(root.find("purpose"))
-    if purpose:
-        lines.append("## 目的")
-        lines.append("")
-        lines.extend(_collect_lines(purpose))
-        lines.append("")
-
-    summary = _extract_text(root.find("summary"))
-    if summary:
-        lines.append("## 概要")
-        lines.append("")
-        lines.extend(_collect_lines(summary))
-        lines.append("")
-
-    arguments = root.find("arguments")
-    args = arguments.findall("arg") if arguments is not None else []
-    if args:
-        lines.append("## 引数")
-        lines.append("")
-        for index, arg in enumerate(args, 1):
-            lines.append(f"### 引数 {index}")
-            name_text = _extract_text(arg.find("name"))
-            type_text = _extract_text(arg.find("type"))
-            description_text = _extract_text(arg.find("description"))
-            if name_text:
-                lines.append(f"- 名前: {name_text}")
-            if type_text:
-                lines.append(f"- 型: {type_text}")
-            if description_text:
-                lines.append(f"- 説明: {description_text}")
-            lines.append("")
-
-    return_value = root.find("return-value")
-    if return_value is not None:
-        return_type = _extract_text(return_value.find("type"))
-        return_description = _extract_text(return_value.find("description"))
-        if return_type or return_description:
-            lines.append("## 戻り値")
-            lines.append("")
-            if return_type:
-                lines.append(f"- 型: {return_type}")
-            if return_description:
-                lines.append(f"- 説明: {return_description}")
-            lines.append("")
-
-    remark_lines = _collect_lines(_extract_text(root.find("remarks")))
+
+def _text_section_lines(title: str, node) -> list[str]:
+    text = _extract_text(node)
+    if not text:
+        return []
+    return [f"## {title}", "", *_collect_lines(text), ""]
+
+
+def _argument_lines(index: int, arg: ET.Element) -> list[str]:
+    lines = [f"### 引数 {index}"]
+    name_text = _extract_text(arg.find("name"))
+    type_text = _extract_text(arg.find("type"))
+    description_text = _extract_text(arg.find("description"))
+    if name_text:
+        lines.append(f"- 名前: {name_text}")
+    if type_text:
+        lines.append(f"- 型: {type_text}")
+    if description_text:
+        lines.append(f"- 説明: {description_text}")
+    lines.append("")
+    return lines
+
+
+def _return_value_lines(return_value) -> list[str]:
+    if return_value is None:
+        return []
+    return_type = _extract_text(return_value.find("type"))
+    return_description = _extract_text(return_value.find("description"))
+    if not (return_type or return_description):
+        return []
+    lines = ["## 戻り値", ""]
+    if return_type:
+        lines.append(f"- 型: {return_type}")
+    if return_description:
+        lines.append(f"- 説明: {return_description}")
+    lines.append("")
+    return lines
+
+
+def _remarks_lines(node) -> list[str]:
     remarks = []
-    for remark in remark_lines:
+    for remark in _collect_lines(_extract_text(node)):
         cleaned = remark.strip()
         if not cleaned:
             continue
@@ -97,39 +90,94 @@ def function_to_markdown(root: ET.Element) -> str:
         else:
             remarks.append(f"- {cleaned}")
 
-    if remarks:
-        lines.append("## 備考")
-        lines.append("")
-        for remark in remarks:
-            lines.append(remark)
-        lines.append("")
-
-    process_flow = root.find("process-flow")
-    steps = process_flow.findall("step") if process_flow is not None else []
-    processed_steps = [s for s in (_extract_text(step) for step in steps) if s]
-    if processed_steps:
-        lines.append("## 処理の流れ")
-        lines.append("")
-        for idx, step in enumerate(processed_steps, 1):
-            lines.append(f"{idx}. {step}")
-        lines.append("")
-
-    db_queries = root.find("database-queries")
-    queries = db_queries.findall("query") if db_queries is not None else []
-    if queries:
-        lines.append("## データベースクエリ")
-        lines.append("")
-        for index, query in enumerate(queries, 1):
-            lines.append(f"### クエリ {index}")
-            lines.append("")
-            desc = _extract_text(query.find("description")) or "不明"
-            pseudo_sql = _extract_text(query.find("pseudo-sql")) or "不明"
-            lines.append("説明:")
-            lines.append(desc)
-            lines.append("")
-            lines.append("擬似SQL:")
-            lines.append(pseudo_sql)
-            lines.append("")
+    if not remarks:
+        return []
+    return ["## 備考", "", *remarks, ""]
+
+
+def _step_lines(index: int, step: ET.Element) -> list[str] | None:
+    text = _extract_text(step)
+    if not text:
+        return None
+    return [f"{index}. {text}"]
+
+
+def _query_lines(index: int, query: ET.Element) -> list[str]:
+    desc = _extract_text(query.find("description")) or "不明"
+    pseudo_sql = _extract_text(query.find("pseudo-sql")) or "不明"
+    return [
+        f"### クエリ {index}",
+        "",
+        "説明:",
+        desc,
+        "",
+        "擬似SQL:",
+        pseudo_sql,
+        "",
+    ]
+
+
+# Sections rendered item by item: tag -> (item tag, heading, renderer, trailer).
+# Items for which the renderer returns None are skipped without numbering.
+_LIST_SECTIONS = {
+    "arguments": ("arg", ["## 引数", ""], _argument_lines, []),
+    "process-flow": ("step", ["## 処理の流れ", ""], _step_lines, [""]),
+    "database-queries": (
+        "query",
+        ["## データベースクエリ", ""],
+        _query_lines,
+        [],
+    ),
+}
+
+# Sections rendered once the whole element is available.
+_WHOLE_SECTIONS = {
+    "name": _name_lines,
+    "purpose": lambda node: _text_section_lines("目的", node),
+    "summary": lambda node: _text_section_lines("概要", node),
+    "return-value": _return_value_lines,
+    "remarks": _remarks_lines,
+}
+
+# Order in which sections appear in the Markdown output.
+_SECTION_ORDER = (
+    "name",
+    "purpose",
+    "summary",
+    "arguments",
+    "return-value",
+    "remarks",
+    "process-flow",
+    "database-queries",
+)
+
+
+def _list_section_lines(tag: str, parent) -> list[str]:
+    item_tag, heading, render_item, trailer = _LIST_SECTIONS[tag]
+    items = parent.findall(item_tag) if parent is not None else []
+    lines: list[str] = []
+    count = 0
+    for item in items:
+        item_lines = render_item(count + 1, item)
+        if item_lines is None:
+            continue
+        if not count:
+            lines.extend(heading)
+        count += 1
+        lines.extend(item_lines)
+    if count:
+        lines.extend(trailer)
+    return lines
+
+
+def function_to_markdown(root: ET.Element) -> str:
+    lines: list[str] = []
+
+    for tag in _SECTION_ORDER:
+        if tag in _LIST_SECTIONS:
+            lines.extend(_list_section_lines(tag, root.find(tag)))
+        else:
+            lines.extend(_WHOLE_SECTIONS[tag](root.find(tag)))
 
     while lines and lines[-1] == "":
         lines.pop()
@@ -137,6 +185,160 @@ def function_to_markdown(root: ET.Element) -> str:
     return "\n".join(lines)
 
 
+class _MarkdownWriter:
+    """Write lines to a stream exactly as "\n".join(lines) would lay them out.
+
+    Blank lines are held back until a non-blank line follows, so trailing
+    blank lines are dropped like in function_to_markdown.
+    """
+
+    def __init__(self, fp: TextIO):
+        self._fp = fp
+        self._started = False
+        self._pending_blanks = 0
+
+    def write_lines(self, lines: list[str]) -> None:
+        for line in lines:
+            if line == "":
+                self._pending_blanks += 1
+                continue
+            for piece in [""] * self._pending_blanks + [line]:
+                if self._started:
+                    self._fp.write("\n")
+                self._fp.write(piece)
+                self._started = True
+            self._pending_blanks = 0
+
+
+class _SectionSequencer:
+    """Forward rendered sections to the writer in _SECTION_ORDER.
+
+    Sections that appear out of order in the XML are held as rendered lines
+    until every section before them has been completed. Sections missing
+    from the document count as completed from the start.
+    """
+
+    def __init__(self, writer: _MarkdownWriter, present: set[str]):
+        self._writer = writer
+        self._buffers: dict[str, list[str]] = {tag: [] for tag in _SECTION_ORDER}
+        self._done: set[str] = set(_SECTION_ORDER) - present
+        self._cursor = 0
+        self._advance()
+
+    def emit(self, tag: str, lines: list[str]) -> None:
+        if tag == self._current():
+            self._writer.write_lines(lines)
+        else:
+            self._buffers[tag].extend(lines)
+
+    def finish(self, tag: str) -> None:
+        self._done.add(tag)
+        self._advance()
+
+    def close(self) -> None:
+        self._done.update(_SECTION_ORDER)
+        self._advance()
+
+    def _current(self) -> str | None:
+        if self._cursor < len(_SECTION_ORDER):
+            return _SECTION_ORDER[self._cursor]
+        return None
+
+    def _advance(self) -> None:
+        while self._cursor < len(_SECTION_ORDER):
+            tag = _SECTION_ORDER[self._cursor]
+            self._writer.write_lines(self._buffers[tag])
+            self._buffers[tag] = []
+            if tag not in self._done:
+                break
+            self._cursor += 1
+
+
+def _scan_sections(source) -> set[str]:
+    """Return the top-level tags of a <function> document in constant memory."""
+    present: set[str] = set()
+    stack: list[ET.Element] = []
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if not stack and elem.tag != "function":
+                raise ValueError("ルート要素は <function> である必要があります。")
+            if len(stack) == 1:
+                present.add(elem.tag)
+            stack.append(elem)
+            continue
+        stack.pop()
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+    return present
+
+
+def stream_function_to_markdown(xml_path: Path, fp: TextIO) -> None:
+    """Render xml_path to fp with iterparse, matching function_to_markdown.
+
+    A first pass records which sections exist so that output never has to
+    wait for a section that is not there. The second pass renders <arg>,
+    <step> and <query> one at a time and other sections when their element
+    ends; elements are cleared as soon as they are emitted.
+    """
+    with xml_path.open("rb") as source:
+        present = _scan_sections(source)
+        source.seek(0)
+
+        sequencer = _SectionSequencer(_MarkdownWriter(fp), present)
+        sections: dict[str, ET.Element] = {}
+        counts: dict[str, int] = defaultdict(int)
+        stack: list[ET.Element] = []
+
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if event == "start":
+                if (
+                    len(stack) == 1
+                    and elem.tag in _SECTION_ORDER
+                    and elem.tag not in sections
+                ):
+                    sections[elem.tag] = elem
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            if not stack:
+                continue
+            parent = stack[-1]
+
+            if len(stack) == 1:
+                if sections.get(elem.tag) is elem:
+                    if elem.tag in _LIST_SECTIONS:
+                        if counts[elem.tag]:
+                            sequencer.emit(elem.tag, _LIST_SECTIONS[elem.tag][3])
+                    else:
+                        sequencer.emit(elem.tag, _WHOLE_SECTIONS[elem.tag](elem))
+                    sequencer.finish(elem.tag)
+            elif (
+                len(stack) == 2
+                and parent.tag in _LIST_SECTIONS
+                and sections.get(parent.tag) is parent
+            ):
+                item_tag, heading, render_item, _ = _LIST_SECTIONS[parent.tag]
+                item_lines = (
+                    render_item(counts[parent.tag] + 1, elem)
+                    if elem.tag == item_tag
+                    else None
+                )
+                if item_lines is not None:
+                    if not counts[parent.tag]:
+                        sequencer.emit(parent.tag, heading)
+                    counts[parent.tag] += 1
+                    sequencer.emit(parent.tag, item_lines)
+            else:
+                continue
+
+            elem.clear()
+            parent.remove(elem)
+
+    sequencer.close()
+
+
 def parse_function(xml_path: Path) -> ET.Element:
     tree = ET.parse(xml_path)
     root = tree.getroot()
@@ -155,6 +357,34 @@ def convert(
     return _append_dependencies(markdown, xml_path, analysis, doc_lookup)
 
 
+def convert_to_stream(
+    xml_path: Path,
+    fp: TextIO,
+    analysis: AnalysisIndex | None = None,
+    doc_lookup: dict[str, Path] | None = None,
+) -> None:
+    stream_function_to_markdown(xml_path, fp)
+    dependency_lines = _dependency_lines(xml_path, analysis, doc_lookup)
+    if dependency_lines:
+        fp.write("\n\n" + "\n".join(dependency_lines))
+
+
+def _write_stream_output(
+    output_path: Path,
+    xml_path: Path,
+    analysis: AnalysisIndex | None,
+    doc_lookup: dict[str, Path] | None,
+) -> None:
+    """Stream into a sibling temp file so output_path is untouched on error."""
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    try:
+        with tmp_path.open("w", encoding="utf-8") as fp:
+            convert_to_stream(xml_path, fp, analysis=analysis, doc_lookup=doc_lookup)
+        os.replace(tmp_path, output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
 class AnalysisIndex:
     def __init__(
         self, functions: dict[str, dict[str, object]], callers: dict[str, list[str]]
@@ -217,14 +447,27 @@ def _load_purpose_from_doc(doc_md_path: str) -> str:
     doc_xml = doc_path.with_name("doc.xml")
     if not doc_xml.exists():
         return ""
+    stack: list[ET.Element] = []
     try:
-        tree = ET.parse(doc_xml)
+        with doc_xml.open("rb") as source:
+            for event, elem in ET.iterparse(source, events=("start", "end")):
+                if event == "start":
+                    if not stack and elem.tag != "function":
+                        return ""
+                    stack.append(elem)
+                    continue
+                stack.pop()
+                if not stack:
+                    continue
+                if len(stack) == 1 and elem.tag == "purpose":
+                    return _extract_text(elem)
+                if len(stack) > 1 and stack[1].tag == "purpose":
+                    continue
+                elem.clear()
+                stack[-1].remove(elem)
     except ET.ParseError:
         return ""
-    root = tree.getroot()
-    if root.tag != "function":
-        return ""
-    return _extract_text(root.find("purpose"))
+    return ""
 
 
 def _format_dependency_list(
@@ -256,14 +499,13 @@ def _format_dependency_list(
     return lines
 
 
-def _append_dependencies(
-    markdown: str,
+def _dependency_lines(
     xml_path: Path,
     analysis: AnalysisIndex | None,
     doc_lookup: dict[str, Path] | None,
-) -> str:
+) -> list[str]:
     if not analysis:
-        return markdown
+        return []
 
     func_id = None
     for candidate in xml_path.parent.glob("func_*"):
@@ -271,7 +513,7 @@ def _append_dependencies(
             func_id = candidate.name
             break
     if not func_id:
-        return markdown
+        return []
 
     if doc_lookup is not None and func_id not in doc_lookup:
         doc_lookup[func_id] = xml_path.with_name("doc.md")
@@ -280,7 +522,7 @@ def _append_dependencies(
     callees = analysis.callees_of(func_id)
 
     if not callers and not callees:
-        return markdown
+        return []
 
     current_dir = xml_path.parent
     sections: list[str] = []
@@ -291,20 +533,35 @@ def _append_dependencies(
     sections.append("## Callee")
     sections.append("")
     sections.extend(_format_dependency_list(current_dir, callees, doc_lookup))
+    return sections
+
 
+def _append_dependencies(
+    markdown: str,
+    xml_path: Path,
+    analysis: AnalysisIndex | None,
+    doc_lookup: dict[str, Path] | None,
+) -> str:
+    sections = _dependency_lines(xml_path, analysis, doc_lookup)
+    if not sections:
+        return markdown
     return markdown + "\n\n" + "\n".join(sections)
 
 
 def process_directory(
     directory: Path,
     analysis: AnalysisIndex | None,
+    stream: bool = False,
 ) -> list[Path]:
     generated_paths: list[Path] = []
     doc_lookup = build_doc_lookup(directory) if analysis else {}
     for xml_path in directory.rglob("doc.xml"):
-        markdown = convert(xml_path, analysis=analysis, doc_lookup=doc_lookup)
         output_path = xml_path.with_name("doc.md")
-        output_path.write_text(markdown, encoding="utf-8")
+        if stream:
+            _write_stream_output(output_path, xml_path, analysis, doc_lookup)
+        else:
+            markdown = convert(xml_path, analysis=analysis, doc_lookup=doc_lookup)
+            output_path.write_text(markdown, encoding="utf-8")
         generated_paths.append(output_path)
     return generated_paths
 
@@ -330,6 +587,11 @@ def main():
         type=Path,
         help="入力が単一XMLファイルの場合の出力Markdownファイルのパス。省略時は標準出力に出力します。",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="XML全体を読み込まず、iterparseで逐次変換します（巨大なdoc.xml向け）。",
+    )
     args = parser.parse_args()
 
     target = args.path
@@ -343,7 +605,7 @@ def main():
     if target.is_dir():
         if args.output:
             parser.error("ディレクトリを指定した場合、--output は使用できません。")
-        generated_paths = process_directory(target, analysis_index)
+        generated_paths = process_directory(target, analysis_index, stream=args.stream)
         if not generated_paths:
             print("doc.xml が見つかりませんでした。", file=sys.stderr)
         else:
@@ -355,6 +617,17 @@ def main():
         parser.error(f"指定されたパスが存在しません: {target}")
 
     doc_lookup = build_doc_lookup(target.parent) if analysis_index else None
+
+    if args.stream:
+        if args.output:
+            _write_stream_output(args.output, target, analysis_index, doc_lookup)
+        else:
+            convert_to_stream(
+                target, sys.stdout, analysis=analysis_index, doc_lookup=doc_lookup
+            )
+            print()
+        return
+
     markdown = convert(target, analysis=analysis_index, doc_lookup=doc_lookup)
 
     if args.output: